@@ -3,30 +3,436 @@
 """
 import asyncio
 import base64
+import binascii
+import functools
+import hashlib
 import os
+import signal
+import sys
+import threading
 import time
-from base64 import b64encode
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple, Union
 
 import aiofiles
 import websockets.client
-from msgspec import json as msgjson
+from msgspec import Raw, json as msgjson
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError
 
 from framework_common.framework_util.websocket_fix import ExtendBot
 from framework_common.framework_util.yamlLoader import YAMLManager
-from developTools.event.events import GroupMessageEvent, PrivateMessageEvent
+from developTools.event.events import GroupMessageEvent, LifecycleMetaEvent, PrivateMessageEvent
 from developTools.message.message_components import (
     At,
     File,
     Image,
+    Node,
     Text,
     Record,
     Video,
     MessageComponent
 )
 
+# base64分块编码的块大小，必须是3的倍数以保证各块之间不出现填充
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+# 发送缓冲区超过该大小时在发送后释放，避免长期占用大块内存
+SEND_BUFFER_KEEP_SIZE = 1024 * 1024
+# 放入消息队列末尾，发送任务发送完之前的消息后退出
+SEND_STOP = object()
+
+
+class MessageDeduplicator:
+    """
+    有界、带时间窗口的消息去重集合
+    """
+    def __init__(self, window: float = 60, max_size: int = 2048):
+        """
+        初始化去重集合
+        
+        Args:
+            window: 去重时间窗口(秒)
+            max_size: 最多记录的消息数
+        """
+        self.window = window
+        self.max_size = max_size
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+    
+    def _expire(self, now: float):
+        """
+        移除超出时间窗口或超出容量的记录
+        """
+        while self._seen:
+            key, ts = next(iter(self._seen.items()))
+            if now - ts <= self.window and len(self._seen) <= self.max_size:
+                break
+            self._seen.popitem(last=False)
+    
+    def check_and_add(self, *keys: Hashable) -> bool:
+        """
+        检查消息是否重复，未重复时记录所有键
+        
+        Args:
+            keys: 消息的去重键，任意一个已存在即视为重复
+            
+        Returns:
+            消息是否重复
+        """
+        now = time.monotonic()
+        self._expire(now)
+        if any(key in self._seen for key in keys):
+            return True
+        for key in keys:
+            self._seen[key] = now
+        self._expire(now)
+        return False
+
+
+@dataclass
+class TrackedMessage:
+    """
+    正在处理中的消息
+    """
+    kind: str
+    msg_id: str
+    start: float = field(default_factory=time.monotonic)
+    sizes: Dict[str, int] = field(default_factory=dict)
+    stack: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+    excluded: float = 0.0
+    excluded_since: Optional[float] = None
+    
+    def elapsed(self, now: Optional[float] = None) -> float:
+        """
+        计入预算的处理时间，不包括exclude()中的等待
+        """
+        now = time.monotonic() if now is None else now
+        paused = now - self.excluded_since if self.excluded_since is not None else 0.0
+        return now - self.start - self.excluded - paused
+    
+    @contextmanager
+    def exclude(self, reason: str) -> Iterator[None]:
+        """
+        不计入预算的等待，例如等待建立连接，等待时间记录在sizes中
+        
+        Args:
+            reason: 等待原因
+        """
+        self.excluded_since = time.monotonic()
+        try:
+            yield
+        finally:
+            waited = time.monotonic() - self.excluded_since
+            self.excluded += waited
+            self.excluded_since = None
+            self.sizes[f'{reason}_wait_ms'] = int(waited * 1000)
+    
+    def describe(self) -> str:
+        """
+        消息的简要描述，用于日志，采样线程也会调用
+        """
+        sizes = ', '.join(f'{k}={v}' for k, v in dict(self.sizes).items())
+        return f'{self.kind} msg_id={self.msg_id} [{sizes}]'
+
+
+class LoopWatchdog:
+    """
+    事件循环延迟监视器
+    
+    协程定期测量事件循环延迟，并在消息处理超出预算时记录处理该消息的任务的
+    调用栈；采样线程在事件循环阻塞时抓取事件循环线程的调用栈
+    """
+    def __init__(self, logger, interval: float = 0.5, lag_threshold: float = 0.2, budget: float = 2.0):
+        """
+        初始化监视器
+        
+        Args:
+            logger: 日志记录器
+            interval: 测量间隔(秒)
+            lag_threshold: 事件循环延迟告警阈值(秒)
+            budget: 单条消息处理时间预算(秒)
+        """
+        self.logger = logger
+        self.interval = interval
+        self.lag_threshold = lag_threshold
+        self.budget = budget
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._stall_reported = False
+        self._active: Dict[int, TrackedMessage] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        """
+        在当前事件循环中启动监视器
+        """
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._monitor())
+        self._thread = threading.Thread(target=self._sample, name='gs-core-watchdog', daemon=True)
+        self._thread.start()
+        self.logger.info('[watchdog] 事件循环监视已启动')
+    
+    def stop(self):
+        """
+        停止监视器
+        """
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    @contextmanager
+    def track(self, kind: str, msg_id) -> Iterator[TrackedMessage]:
+        """
+        记录一条消息的处理过程，超出预算时输出耗时、消息大小和处理该消息的任务的调用栈
+        
+        Args:
+            kind: 消息来源
+            msg_id: 消息ID
+        """
+        tracked = TrackedMessage(kind, str(msg_id), task=asyncio.current_task())
+        self._active[id(tracked)] = tracked
+        try:
+            yield tracked
+        finally:
+            self._active.pop(id(tracked), None)
+            elapsed = tracked.elapsed()
+            if elapsed > self.budget:
+                stack = f'\n{tracked.stack}' if tracked.stack else ''
+                self.logger.warning(
+                    f'[watchdog] 消息处理耗时 {elapsed * 1000:.0f}ms 超出预算: {tracked.describe()}{stack}'
+                )
+    
+    def _describe_active(self) -> str:
+        """
+        正在处理中的消息描述
+        """
+        active = list(self._active.values())
+        if not active:
+            return ''
+        return ' 处理中: ' + '; '.join(t.describe() for t in active)
+    
+    @staticmethod
+    def _task_stack(task: asyncio.Task) -> str:
+        """
+        沿await链获取任务当前挂起位置的调用栈，只能在事件循环线程中调用
+        """
+        lines = [f'任务 {task.get_name()} 的调用栈 (most recent call last):\n']
+        coro = task.get_coro()
+        while coro is not None:
+            frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+            if frame is not None:
+                lines.extend(traceback.format_stack(frame, limit=1))
+            coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+        return ''.join(lines)
+    
+    def _loop_stack(self) -> str:
+        """
+        抓取事件循环线程当前的调用栈
+        """
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ''
+        return ''.join(traceback.format_stack(frame))
+    
+    async def _monitor(self):
+        """
+        定期测量事件循环延迟
+        """
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = now - start - self.interval
+            if lag > self.lag_threshold:
+                self.logger.warning(f'[watchdog] 事件循环延迟 {lag * 1000:.0f}ms{self._describe_active()}')
+            for tracked in list(self._active.values()):
+                if (
+                    tracked.stack is None
+                    and tracked.task is not None
+                    and tracked.excluded_since is None
+                    and tracked.elapsed(now) > self.budget
+                ):
+                    tracked.stack = self._task_stack(tracked.task)
+    
+    def _sample(self):
+        """
+        采样线程，在事件循环阻塞时抓取事件循环线程的调用栈
+        """
+        while not self._stop.wait(self.interval / 2):
+            try:
+                now = time.monotonic()
+                stalled = now - self._heartbeat - self.interval > self.lag_threshold
+                if stalled and not self._stall_reported:
+                    self._stall_reported = True
+                    self.logger.warning(
+                        f'[watchdog] 事件循环阻塞超过 {self.lag_threshold * 1000:.0f}ms'
+                        f'{self._describe_active()}\n{self._loop_stack()}'
+                    )
+                elif not stalled:
+                    self._stall_reported = False
+            except Exception as e:
+                # 采样线程退出后将不再检测阻塞，出错时记录并继续
+                try:
+                    self.logger.error(f'[watchdog] 采样时出错: {e}')
+                except Exception:
+                    pass
+
+
+@dataclass
+class CachedResponse:
+    """
+    一条命令的全部回复，收集中的回复与已缓存的回复共用该结构
+    """
+    key: Tuple
+    expires: float
+    replies: List[List[MessageComponent]] = field(default_factory=list)
+    updated: float = field(default_factory=time.monotonic)
+
+
+class ResponseCache:
+    """
+    幂等命令的本地回复缓存
+    
+    以规范化后的命令文本(及可选的群/用户范围)为键，缓存早柚核心对该命令的
+    全部回复。每次发送给早柚核心的命令按msg_id单独收集回复，最后一条回复到达
+    settle秒后才整体放入缓存，已缓存且未过期的回复不会被其他请求覆盖。范围
+    不是user时，回复中@原发送者的At组件不会被缓存
+    """
+    SCOPES = ('global', 'group', 'user')
+    
+    def __init__(self, ttls: Dict[str, float], scope: str = 'global', max_size: int = 256, settle: float = 3.0):
+        """
+        初始化回复缓存
+        
+        Args:
+            ttls: 命令文本到缓存时间(秒)的映射
+            scope: 缓存范围，global/group/user
+            max_size: 最多缓存的命令数
+            settle: 最后一条回复到达后开始命中的等待时间(秒)
+        """
+        self.ttls = {self.normalize(k): float(v) for k, v in ttls.items()}
+        self.scope = scope if scope in self.SCOPES else 'global'
+        self.max_size = max_size
+        self.settle = settle
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        # 等待早柚核心回复的命令，msg_id -> 正在收集的回复
+        self._pending: "OrderedDict[str, CachedResponse]" = OrderedDict()
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        规范化命令文本，合并空白字符
+        """
+        return ' '.join(str(text).split())
+    
+    def key(self, command: str, group_id: Optional[str], user_id: str) -> Optional[Tuple]:
+        """
+        计算命令的缓存键，未配置缓存的命令返回None
+        
+        Args:
+            command: 命令文本
+            group_id: 群号，私聊为None
+            user_id: 用户ID
+        """
+        command = self.normalize(command)
+        if command not in self.ttls:
+            return None
+        if self.scope == 'group':
+            return command, group_id or f'direct:{user_id}'
+        if self.scope == 'user':
+            return command, user_id
+        return (command,)
+    
+    def get(self, key: Tuple) -> Optional[List[List[MessageComponent]]]:
+        """
+        获取缓存的回复
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            缓存的回复列表，未命中时返回None
+        """
+        now = time.monotonic()
+        self._promote(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now >= entry.expires:
+            del self._entries[key]
+            return None
+        return entry.replies
+    
+    def expect(self, msg_id: str, key: Tuple):
+        """
+        记录等待早柚核心回复的命令
+        
+        Args:
+            msg_id: 发送给早柚核心的消息ID
+            key: 缓存键
+        """
+        now = time.monotonic()
+        self._promote(now)
+        self._pending[msg_id] = CachedResponse(key, now + self.ttls[key[0]], updated=now)
+        self._pending.move_to_end(msg_id)
+        while len(self._pending) > self.max_size:
+            self._pending.popitem(last=False)
+    
+    def add_reply(self, msg_id: Optional[str], reply: List[MessageComponent]):
+        """
+        将早柚核心的回复加入对应命令正在收集的回复
+        
+        Args:
+            msg_id: 回复对应的原消息ID
+            reply: 转换后的回复消息
+        """
+        pending = self._pending.get(str(msg_id)) if msg_id else None
+        if pending is None:
+            return
+        if self.scope != 'user':
+            reply = [c for c in reply if not isinstance(c, At)]
+            if not reply:
+                return
+        now = time.monotonic()
+        if now >= pending.expires:
+            del self._pending[str(msg_id)]
+            return
+        pending.replies.append(reply)
+        pending.updated = now
+    
+    def _promote(self, now: float):
+        """
+        将已收集完成的回复放入缓存，并移除过期的等待记录
+        
+        放入缓存后删除对应的等待记录，之后迟到的回复不会再改变已缓存的内容
+        """
+        for msg_id, pending in list(self._pending.items()):
+            if now >= pending.expires:
+                del self._pending[msg_id]
+                continue
+            if not pending.replies or now - pending.updated < self.settle:
+                continue
+            del self._pending[msg_id]
+            entry = self._entries.get(pending.key)
+            if entry is not None and now < entry.expires:
+                continue
+            ttl = self.ttls[pending.key[0]]
+            self._entries[pending.key] = CachedResponse(pending.key, now + ttl, pending.replies, pending.updated)
+            self._entries.move_to_end(pending.key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
 
 class GsCoreAdapter:
     """
@@ -48,9 +454,180 @@ class GsCoreAdapter:
         self.IP = config.GsCore_to_Eridanus.gs_core['config'].get("IP", "127.0.0.1")
         self.PORT = config.GsCore_to_Eridanus.gs_core['config'].get("PORT", 8765)
         self.ws_url = f'ws://{self.IP}:{self.PORT}/ws/{self.BOT_ID}'
+        # 重连、保活与关闭参数
+        self.MAX_RECONNECT_ATTEMPTS = config.GsCore_to_Eridanus.gs_core['config'].get("MAX_RECONNECT_ATTEMPTS", 30)
+        self.RECONNECT_INTERVAL = config.GsCore_to_Eridanus.gs_core['config'].get("RECONNECT_INTERVAL", 5)
+        self.OPEN_TIMEOUT = config.GsCore_to_Eridanus.gs_core['config'].get("OPEN_TIMEOUT", 60)
+        self.PING_INTERVAL = config.GsCore_to_Eridanus.gs_core['config'].get("PING_INTERVAL", 20)
+        self.PING_TIMEOUT = config.GsCore_to_Eridanus.gs_core['config'].get("PING_TIMEOUT", 60)
+        self.CLOSE_TIMEOUT = config.GsCore_to_Eridanus.gs_core['config'].get("CLOSE_TIMEOUT", 10)
+        self.SHUTDOWN_TIMEOUT = config.GsCore_to_Eridanus.gs_core['config'].get("SHUTDOWN_TIMEOUT", 5)
+        self.data_dir = Path(__file__).parent.parent.parent / "data" / "gs_core"
         self.msg_list = asyncio.queues.Queue()
         self.pending = []
+        # 关闭过程中不再接收新消息
+        self.accepting = True
+        self.start_task = None
+        self.send_task = None
+        self.shutdown_task = None
+        self.encoder = msgjson.Encoder()
+        self.decoder = msgjson.Decoder()
+        # 复用的发送缓冲区
+        self.send_buffer = bytearray()
+        # 合并多条回复为合并转发消息
+        self.AGGREGATE_THRESHOLD = config.GsCore_to_Eridanus.gs_core['config'].get("AGGREGATE_THRESHOLD", 0)
+        self.AGGREGATE_WINDOW = config.GsCore_to_Eridanus.gs_core['config'].get("AGGREGATE_WINDOW", 1.0)
+        self.AGGREGATE_MAX_NODES = config.GsCore_to_Eridanus.gs_core['config'].get("AGGREGATE_MAX_NODES", 50)
+        self.reply_buffers: Dict[Tuple[str, str, str], List[List[MessageComponent]]] = {}
+        self.reply_flush_tasks: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        # 幂等命令的本地回复缓存
+        self.response_cache = None
+        response_cache_ttls = config.GsCore_to_Eridanus.gs_core['config'].get("RESPONSE_CACHE") or {}
+        if response_cache_ttls:
+            self.response_cache = ResponseCache(
+                response_cache_ttls,
+                scope=config.GsCore_to_Eridanus.gs_core['config'].get("RESPONSE_CACHE_SCOPE", "global"),
+                max_size=config.GsCore_to_Eridanus.gs_core['config'].get("RESPONSE_CACHE_MAX_SIZE", 256),
+                settle=config.GsCore_to_Eridanus.gs_core['config'].get("RESPONSE_CACHE_SETTLE", 3.0),
+            )
+        # 可选的事件循环延迟监视
+        self.watchdog = None
+        if config.GsCore_to_Eridanus.gs_core['config'].get("WATCHDOG", False):
+            self.watchdog = LoopWatchdog(
+                bot.logger,
+                interval=config.GsCore_to_Eridanus.gs_core['config'].get("WATCHDOG_INTERVAL", 0.5),
+                lag_threshold=config.GsCore_to_Eridanus.gs_core['config'].get("WATCHDOG_LAG_THRESHOLD", 0.2),
+                budget=config.GsCore_to_Eridanus.gs_core['config'].get("MESSAGE_BUDGET", 2.0),
+            )
+        # 多账号或OneBot重发时的重复消息过滤
+        self.dedup = MessageDeduplicator(
+            window=config.GsCore_to_Eridanus.gs_core['config'].get("DEDUP_WINDOW", 60),
+            max_size=config.GsCore_to_Eridanus.gs_core['config'].get("DEDUP_MAX_SIZE", 2048),
+        )
+        # 按内容去重只需覆盖多个账号收到同一条消息的间隔
+        self.content_dedup = None
+        if config.GsCore_to_Eridanus.gs_core['config'].get("DEDUP_BY_CONTENT", False):
+            self.content_dedup = MessageDeduplicator(
+                window=config.GsCore_to_Eridanus.gs_core['config'].get("DEDUP_CONTENT_WINDOW", 3),
+                max_size=config.GsCore_to_Eridanus.gs_core['config'].get("DEDUP_MAX_SIZE", 2048),
+            )
+    
+    def warm_up(self):
+        """
+        预热编码器与临时目录，避免首条消息承担初始化开销
+        """
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            self.bot.logger.error(f'[错误] 目录创建失败: {e}')
+        sample = {
+            'bot_id': 'qq',
+            'bot_self_id': '0',
+            'user_type': 'group',
+            'group_id': '0',
+            'user_id': '0',
+            'sender': {'nickname': 'warmup'},
+            'content': [{'type': 'text', 'data': 'warmup'}],
+            'msg_id': '0',
+            'user_pm': 6,
+        }
+        self.decoder.decode(self.encoder.encode(sample))
+        self.bot.logger.debug('[gsuid-core] 编码器预热完成')
+    
+    async def start(self):
+        """
+        插件加载时在后台预热并连接到早柚核心
+        """
+        self.warm_up()
+        self.install_shutdown_hook()
+        if self.watchdog is not None:
+            self.watchdog.start()
+        if not await self.connect():
+            await self.reconnect()
+    
+    def install_shutdown_hook(self):
+        """
+        注册SIGINT/SIGTERM处理，收到信号时先断开连接(发送剩余消息)，再交给原来的信号处理
+        """
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, getattr(signal, 'SIGTERM', None)):
+            if sig is None:
+                continue
+            try:
+                previous = signal.getsignal(sig)
+                signal.signal(sig, functools.partial(self._on_shutdown_signal, loop, previous))
+            except (ValueError, OSError) as e:
+                # 只能在主线程中注册信号处理
+                self.bot.logger.warning(f'[gsuid-core] 无法注册关闭信号处理，关闭时不会发送剩余消息: {e}')
+                return
+    
+    def _on_shutdown_signal(self, loop, previous, signum, frame):
+        """
+        信号处理函数，第一次收到信号时在事件循环中开始关闭，再次收到时直接交给原来的处理
+        """
+        if self.shutdown_task is not None or loop.is_closed() or not loop.is_running():
+            self._call_previous_handler(previous, signum, frame)
+            return
+        loop.call_soon_threadsafe(self._begin_shutdown, previous, signum, frame)
+    
+    def _begin_shutdown(self, previous, signum, frame):
+        """
+        在事件循环中创建关闭任务
+        """
+        if self.shutdown_task is None:
+            self.shutdown_task = asyncio.ensure_future(self._shutdown(previous, signum, frame))
+    
+    async def _shutdown(self, previous, signum, frame):
+        """
+        断开连接后交给原来的信号处理，使框架按原方式退出
+        """
+        self.bot.logger.info('[gsuid-core] 收到关闭信号，正在断开连接...')
+        try:
+            await asyncio.wait_for(self.disconnect(), timeout=self.SHUTDOWN_TIMEOUT + self.CLOSE_TIMEOUT)
+        except Exception as e:
+            self.bot.logger.error(f'[gsuid-core] 断开连接时出错: {e}')
+        finally:
+            self._call_previous_handler(previous, signum, frame)
+    
+    @staticmethod
+    def _call_previous_handler(previous, signum, frame):
+        """
+        恢复并调用原来的信号处理
+        """
+        if previous is None:
+            previous = signal.SIG_DFL
+        signal.signal(signum, previous)
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            os.kill(os.getpid(), signum)
+    
+    def _track(self, kind: str, msg_id):
+        """
+        开启监视时记录消息处理过程
         
+        Args:
+            kind: 消息来源
+            msg_id: 消息ID
+        """
+        if self.watchdog is None:
+            return nullcontext(TrackedMessage(kind, str(msg_id)))
+        return self.watchdog.track(kind, msg_id)
+    
+    async def ensure_connected(self):
+        """
+        确保已连接，后台连接仍在进行时等待其完成而不是重复连接
+        """
+        if self.is_connect:
+            return
+        if self.start_task is not None and not self.start_task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self.start_task), timeout=self.OPEN_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.bot.logger.warning('[gsuid-core] 等待后台连接超时')
+            return
+        await self.connect()
+    
     async def connect(self):
         """
         连接到早柚核心
@@ -59,13 +636,19 @@ class GsCoreAdapter:
             try:
                 self.bot.logger.info(f'正在连接到[gsuid-core]: {self.ws_url}...')
                 self.ws = await websockets.client.connect(
-                    self.ws_url, max_size=2**26, open_timeout=60, ping_timeout=60
+                    self.ws_url,
+                    max_size=2**26,
+                    open_timeout=self.OPEN_TIMEOUT,
+                    ping_interval=self.PING_INTERVAL,
+                    ping_timeout=self.PING_TIMEOUT,
+                    close_timeout=self.CLOSE_TIMEOUT,
                 )
                 self.is_connect = True
                 # 启动消息处理任务
                 recv_task = asyncio.create_task(self.recv_msg())
                 send_task = asyncio.create_task(self.send_msg())
                 self.pending = [recv_task, send_task]
+                self.send_task = send_task
                 self.bot.logger.info('[gsuid-core]: 连接成功')
                 return True
             except websockets.exceptions.InvalidURI as e:
@@ -85,12 +668,91 @@ class GsCoreAdapter:
     async def disconnect(self):
         """
         断开与早柚核心的连接
+        
+        先停止接收新消息，在SHUTDOWN_TIMEOUT内发送完队列中剩余的消息后再关闭连接
         """
+        self.accepting = False
         self.is_connect = False
-        if hasattr(self, 'ws'):
-            await self.ws.close()
+        if self.start_task is not None and not self.start_task.done():
+            self.start_task.cancel()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        # 发送尚在等待合并的回复
+        for key in list(self.reply_buffers):
+            try:
+                await self._flush_replies(key)
+            except Exception as e:
+                self.bot.logger.error(f'发送合并消息时出错: {e}')
+        # 由发送任务按顺序发送完队列中剩余的消息后退出，始终只有一个协程在发送
+        if self.send_task is not None and not self.send_task.done():
+            if not self.msg_list.empty():
+                self.bot.logger.info(f'[gsuid-core] 正在发送剩余的 {self.msg_list.qsize()} 条消息...')
+            self.msg_list.put_nowait(SEND_STOP)
+            done, _ = await asyncio.wait([self.send_task], timeout=self.SHUTDOWN_TIMEOUT)
+            if not done:
+                self.bot.logger.warning(f'[gsuid-core] 发送剩余消息超时，丢弃 {self.msg_list.qsize() - 1} 条消息')
         for task in self.pending:
             task.cancel()
+        if self.pending:
+            await asyncio.wait(self.pending, timeout=self.CLOSE_TIMEOUT)
+        await self._close_ws()
+    
+    async def _drain(self):
+        """
+        在截止时间内发送消息队列中剩余的消息
+        """
+        if self.msg_list.empty() or not hasattr(self, 'ws'):
+            return
+        self.bot.logger.info(f'[gsuid-core] 正在发送剩余的 {self.msg_list.qsize()} 条消息...')
+        try:
+            await asyncio.wait_for(self._flush_queue(), timeout=self.SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.bot.logger.warning(f'[gsuid-core] 发送剩余消息超时，丢弃 {self.msg_list.qsize()} 条消息')
+        except ConnectionClosed as e:
+            self.bot.logger.warning(f'[gsuid-core] 连接已关闭，丢弃 {self.msg_list.qsize()} 条消息: {e}')
+    
+    async def _flush_queue(self):
+        """
+        逐条发送队列中的消息直到队列为空
+        """
+        while not self.msg_list.empty():
+            msg: dict = self.msg_list.get_nowait()
+            if msg is SEND_STOP:
+                continue
+            await self.ws.send(self._encode_frame(msg))
+            self._release_send_buffer()
+    
+    def _encode_frame(self, msg: dict) -> bytearray:
+        """
+        将消息编码到复用的发送缓冲区
+        
+        媒体数据以Raw形式放在消息中，编码时直接拷贝进缓冲区，不再经过str
+        
+        Args:
+            msg: 待发送的消息
+            
+        Returns:
+            编码后的发送缓冲区，在下一次编码前有效
+        """
+        self.encoder.encode_into(msg, self.send_buffer)
+        return self.send_buffer
+    
+    def _release_send_buffer(self):
+        """
+        发送大消息后释放发送缓冲区
+        """
+        if len(self.send_buffer) > SEND_BUFFER_KEEP_SIZE:
+            self.send_buffer = bytearray()
+    
+    async def _close_ws(self):
+        """
+        关闭websocket连接
+        """
+        if hasattr(self, 'ws'):
+            try:
+                await self.ws.close()
+            except Exception as e:
+                self.bot.logger.debug(f'关闭连接时出错: {e}')
     
     async def send_msg(self):
         """
@@ -99,11 +761,14 @@ class GsCoreAdapter:
         while True:
             try:
                 msg: dict = await self.msg_list.get()
+                if msg is SEND_STOP:
+                    self.bot.logger.info('剩余消息发送完毕，消息发送任务退出')
+                    break
                 self.bot.logger.debug(f'从消息队列中取出消息: {msg}')
                 
                 # 编码消息
                 try:
-                    msg_send = msgjson.encode(msg)
+                    msg_send = self._encode_frame(msg)
                 except Exception as e:
                     self.bot.logger.error(f'消息编码失败: {e}')
                     self.bot.logger.debug(f'无法编码的消息: {msg}')
@@ -112,9 +777,16 @@ class GsCoreAdapter:
                 # 发送消息
                 self.bot.logger.debug(f'准备发送消息到早柚核心')
                 await self.ws.send(msg_send)
+                self._release_send_buffer()
                 self.bot.logger.debug(f'消息发送到早柚核心完成')
             except asyncio.CancelledError:
                 self.bot.logger.info('消息发送任务被取消')
+                # 未经disconnect()的取消(例如事件循环结束)，由本任务发送剩余消息再关闭连接；
+                # disconnect()超时后的取消则直接退出
+                if self.accepting:
+                    self.accepting = False
+                    await self._drain()
+                    await self._close_ws()
                 break
             except Exception as e:
                 self.bot.logger.error(f'发送消息时出错: {e}')
@@ -132,7 +804,7 @@ class GsCoreAdapter:
             async for message in self.ws:
                 try:
                     # 解码消息
-                    msg = msgjson.decode(message)
+                    msg = self.decoder.decode(message)
                     self.bot.logger.debug(f'收到原始消息: {message}')
                     
                     # 记录消息基本信息
@@ -145,7 +817,9 @@ class GsCoreAdapter:
                     )
                     
                     # 处理接收到的消息
-                    await self.handle_gs_message(msg)
+                    with self._track('gs-core', msg.get('msg_id')) as tracked:
+                        tracked.sizes['frame'] = len(message)
+                        await self.handle_gs_message(msg)
                 except msgjson.DecodeError as e:
                     self.bot.logger.error(f'消息解码失败: {e}')
                     self.bot.logger.debug(f'无法解码的消息内容: {message}')
@@ -170,10 +844,12 @@ class GsCoreAdapter:
         """
         重新连接到早柚核心
         """
-        max_retries = self.config.get('max_reconnect_attempts', 30)
-        retry_interval = self.config.get('reconnect_interval', 5)
+        max_retries = self.MAX_RECONNECT_ATTEMPTS
+        retry_interval = self.RECONNECT_INTERVAL
         
         for attempt in range(max_retries):
+            if not self.accepting:
+                return
             await asyncio.sleep(retry_interval)
             try:
                 self.bot.logger.info(f'[gsuid-core] 尝试重新连接 (尝试 {attempt + 1}/{max_retries})')
@@ -231,21 +907,136 @@ class GsCoreAdapter:
                 self.bot.logger.debug('转换后的消息为空')
                 return
                 
-            # 根据目标类型发送消息
-            if target_type == 'group':
-                await self.bot.send_group_message(int(target_id), eridanus_msg)
-                self.bot.logger.debug(f'群消息发送完成到 {target_id}')
-            elif target_type == 'direct':
-                await self.bot.send_friend_message(int(target_id), eridanus_msg)
-                self.bot.logger.debug(f'私聊消息发送完成到 {target_id}')
+            # 缓存可缓存命令的回复
+            if self.response_cache is not None:
+                self.response_cache.add_reply(msg.get('msg_id'), eridanus_msg)
+                
+            if self.AGGREGATE_THRESHOLD > 1:
+                await self._aggregate_reply(target_type, str(target_id), msg.get('msg_id'), eridanus_msg)
             else:
-                self.bot.logger.warning(f'未知的目标类型: {target_type}')
+                await self._send_to_target(target_type, str(target_id), eridanus_msg)
                 
         except Exception as e:
             self.bot.logger.error(f'处理消息时出错: {e}')
             import traceback
             self.bot.logger.critical(traceback.format_exc())
     
+    async def _send_to_target(self, target_type: str, target_id: str, eridanus_msg: List[MessageComponent]):
+        """
+        根据目标类型发送消息
+        
+        Args:
+            target_type: 目标类型
+            target_id: 目标ID
+            eridanus_msg: Eridanus消息
+        """
+        if target_type == 'group':
+            await self.bot.send_group_message(int(target_id), eridanus_msg)
+            self.bot.logger.debug(f'群消息发送完成到 {target_id}')
+        elif target_type == 'direct':
+            await self.bot.send_friend_message(int(target_id), eridanus_msg)
+            self.bot.logger.debug(f'私聊消息发送完成到 {target_id}')
+        else:
+            self.bot.logger.warning(f'未知的目标类型: {target_type}')
+    
+    @staticmethod
+    def _has_image(reply: List[MessageComponent]) -> bool:
+        """
+        回复中是否包含图片
+        """
+        return any(isinstance(c, Image) for c in reply)
+    
+    @staticmethod
+    def _has_at(reply: List[MessageComponent]) -> bool:
+        """
+        回复中是否包含@，包含@的回复放入转发消息后@会失效
+        """
+        return any(isinstance(c, At) for c in reply)
+    
+    async def _aggregate_reply(
+        self, target_type: str, target_id: str, msg_id: Optional[str], eridanus_msg: List[MessageComponent]
+    ):
+        """
+        将同一条命令的连续回复收集起来，在AGGREGATE_WINDOW秒后一起发送
+        
+        回复按(目标类型, 目标ID, msg_id)分组，避免把同一群里不同用户命令的回复合并在一起；
+        早柚核心没有提供msg_id时退化为按目标分组。没有正在收集的回复时，不含图片的回复
+        直接发送，不增加延迟；包含@的回复始终单独发送
+        
+        Args:
+            target_type: 目标类型
+            target_id: 目标ID
+            msg_id: 回复对应的原消息ID
+            eridanus_msg: Eridanus消息
+        """
+        key = (target_type, target_id, str(msg_id) if msg_id else '')
+        buffer = self.reply_buffers.get(key)
+        if self._has_at(eridanus_msg) or (buffer is None and not self._has_image(eridanus_msg)):
+            # 先发送已收集的回复以保持顺序
+            if buffer is not None:
+                await self._flush_replies(key)
+            await self._send_to_target(target_type, target_id, eridanus_msg)
+            return
+        if buffer is None:
+            buffer = self.reply_buffers[key] = []
+        buffer.append(eridanus_msg)
+        
+        if len(buffer) >= self.AGGREGATE_MAX_NODES:
+            await self._flush_replies(key)
+        elif key not in self.reply_flush_tasks:
+            self.reply_flush_tasks[key] = asyncio.create_task(self._flush_replies_later(key))
+    
+    async def _flush_replies_later(self, key: Tuple[str, str, str]):
+        """
+        等待收集窗口结束后发送收集到的回复
+        
+        Args:
+            key: (目标类型, 目标ID, msg_id)
+        """
+        await asyncio.sleep(self.AGGREGATE_WINDOW)
+        try:
+            await self._flush_replies(key)
+        except Exception as e:
+            self.bot.logger.error(f'发送合并消息时出错: {e}')
+            import traceback
+            self.bot.logger.critical(traceback.format_exc())
+    
+    async def _flush_replies(self, key: Tuple[str, str, str]):
+        """
+        发送收集到的回复
+        
+        Args:
+            key: (目标类型, 目标ID, msg_id)
+        """
+        task = self.reply_flush_tasks.pop(key, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        replies = self.reply_buffers.pop(key, None)
+        if not replies:
+            return
+        
+        target_type, target_id, _ = key
+        await self._send_batch(target_type, target_id, replies)
+    
+    async def _send_batch(self, target_type: str, target_id: str, replies: List[List[MessageComponent]]):
+        """
+        发送一组回复，开启合并且数量达到AGGREGATE_THRESHOLD时合并为一条转发消息
+        
+        Args:
+            target_type: 目标类型
+            target_id: 目标ID
+            replies: 回复列表
+        """
+        if self.AGGREGATE_THRESHOLD > 1 and len(replies) >= self.AGGREGATE_THRESHOLD:
+            for start in range(0, len(replies), self.AGGREGATE_MAX_NODES):
+                chunk = replies[start:start + self.AGGREGATE_MAX_NODES]
+                self.bot.logger.debug(f'合并 {len(chunk)} 条回复为转发消息发送到 {target_id}')
+                nodes = [Node(content=reply) for reply in chunk]
+                await self._send_to_target(target_type, target_id, nodes)
+        else:
+            for reply in replies:
+                await self._send_to_target(target_type, target_id, reply)
+    
     async def _to_eridanus_msg(self, msg: List[dict]) -> List[MessageComponent]:
         """
         将早柚核心消息转换为Eridanus消息
@@ -332,7 +1123,7 @@ class GsCoreAdapter:
             文件路径
         """
         # 创建目标目录 (使用相对路径)
-        target_dir = Path(__file__).parent.parent.parent / "data" / "gs_core"
+        target_dir = self.data_dir
         self.bot.logger.debug(f'[调试] 目标目录路径: {target_dir}')
         try:
             target_dir.mkdir(parents=True, exist_ok=True)
@@ -383,6 +1174,24 @@ class GsCoreAdapter:
         Args:
             event: Eridanus消息事件
         """
+        with self._track('eridanus', event.message_id) as tracked:
+            await self._handle_eridanus_message(event, tracked)
+    
+    async def _handle_eridanus_message(
+        self, event: Union[GroupMessageEvent, PrivateMessageEvent], tracked: TrackedMessage
+    ):
+        """
+        处理来自Eridanus的消息
+        
+        Args:
+            event: Eridanus消息事件
+            tracked: 当前消息的处理记录
+        """
+        # 关闭过程中不再接收新消息
+        if not self.accepting:
+            self.bot.logger.debug('适配器正在关闭，跳过处理')
+            return
+            
         # 检查消息链是否为空
         if not event.message_chain:
             self.bot.logger.debug('收到空消息链')
@@ -407,9 +1216,24 @@ class GsCoreAdapter:
                 new_text = text_content[len(prefix):].lstrip()
                 first_text_msg.text = new_text
         
-        # 确保已连接
+        # 在读取任何媒体文件之前过滤重复消息
+        if self._is_duplicate(event):
+            self.bot.logger.debug(f'收到重复消息，跳过处理: {event.message_id}')
+            return
+        
+        # 命中本地回复缓存时直接回复，不再经过早柚核心
+        cache_key = self._response_cache_key(event)
+        if cache_key is not None:
+            replies = self.response_cache.get(cache_key)
+            if replies is not None:
+                self.bot.logger.debug(f'命中回复缓存: {cache_key}')
+                await self._send_cached_replies(event, replies)
+                return
+        
+        # 确保已连接，等待连接的时间不计入处理预算
         if not self.is_connect:
-            await self.connect()
+            with tracked.exclude('connect'):
+                await self.ensure_connected()
         
         # 检查连接状态
         if not hasattr(self, 'ws'):
@@ -453,11 +1277,11 @@ class GsCoreAdapter:
                         else:
                             # 读取本地文件并转换为base64
                             try:
-                                base64_data = await self._file_to_base64(Path(str(msg.file)))
-                                if base64_data:
+                                base64_data = await self._file_to_base64(Path(str(msg.file)), 'base64://')
+                                if base64_data is not None:
                                     message.append({
                                         'type': 'image',
-                                        'data': f'base64://{base64_data}',
+                                        'data': base64_data,
                                     })
                             except Exception as e:
                                 self.bot.logger.critical(f'处理图片文件时出错: {e}')
@@ -477,11 +1301,11 @@ class GsCoreAdapter:
                         else:
                             # 读取本地文件并转换为base64
                             try:
-                                base64_data = await self._file_to_base64(Path(file_path))
-                                if base64_data:
+                                base64_data = await self._file_to_base64(Path(file_path), f'{file_name}|')
+                                if base64_data is not None:
                                     message.append({
                                         'type': 'file',
-                                        'data': f'{file_name}|{base64_data}',
+                                        'data': base64_data,
                                     })
                             except Exception as e:
                                 self.bot.logger.critical(f'处理文件时出错: {e}')
@@ -524,6 +1348,9 @@ class GsCoreAdapter:
             self.bot.logger.debug('构造的消息为空，跳过发送')
             return
             
+        tracked.sizes['components'] = len(message)
+        tracked.sizes['payload'] = sum(len(c['data']) for c in message)
+            
         # 构造消息对象
         try:
             group_id = None
@@ -542,6 +1369,10 @@ class GsCoreAdapter:
                 'user_pm': pm,
             }
             
+            # 记录等待缓存的回复
+            if cache_key is not None:
+                self.response_cache.expect(msg['msg_id'], cache_key)
+            
             # 发送到消息队列
             self.bot.logger.debug(f'准备将消息放入队列: {msg}')
             await self.msg_list.put(msg)
@@ -552,26 +1383,141 @@ class GsCoreAdapter:
             import traceback
             self.bot.logger.error(traceback.format_exc())
     
-    async def _file_to_base64(self, file_path: Path) -> str:
+    def _response_cache_key(self, event: Union[GroupMessageEvent, PrivateMessageEvent]) -> Optional[Tuple]:
+        """
+        计算纯文本命令的回复缓存键
+        
+        Args:
+            event: Eridanus消息事件
+            
+        Returns:
+            缓存键，未开启缓存、消息不是纯文本或命令未配置缓存时返回None
+        """
+        if self.response_cache is None:
+            return None
+        texts = []
+        for msg in event.message_chain:
+            if not isinstance(msg, Text):
+                return None
+            texts.append(str(msg.text) if msg.text else '')
+        group_id = str(event.group_id) if isinstance(event, GroupMessageEvent) else None
+        return self.response_cache.key(''.join(texts), group_id, str(event.user_id))
+    
+    async def _send_cached_replies(
+        self, event: Union[GroupMessageEvent, PrivateMessageEvent], replies: List[List[MessageComponent]]
+    ):
+        """
+        将缓存的回复发送给消息来源，按与早柚核心回复相同的规则合并为转发消息
+        
+        Args:
+            event: Eridanus消息事件
+            replies: 缓存的回复列表
+        """
+        if isinstance(event, GroupMessageEvent):
+            target_type, target_id = 'group', str(event.group_id)
+        else:
+            target_type, target_id = 'direct', str(event.user_id)
+        
+        batch: List[List[MessageComponent]] = []
+        for reply in replies:
+            if self._has_at(reply) or (not batch and not self._has_image(reply)):
+                await self._send_batch(target_type, target_id, batch)
+                batch = []
+                await self._send_to_target(target_type, target_id, reply)
+            else:
+                batch.append(reply)
+        await self._send_batch(target_type, target_id, batch)
+    
+    def _is_duplicate(self, event: Union[GroupMessageEvent, PrivateMessageEvent]) -> bool:
+        """
+        判断消息是否已处理过
+        
+        以(group_id, message_id)为键，开启DEDUP_BY_CONTENT时额外在较短的
+        DEDUP_CONTENT_WINDOW内以(group_id, user_id, 内容摘要)为键，用于识别不同账号
+        收到的同一条消息，同时不影响用户稍后重复发送相同的命令
+        
+        Args:
+            event: Eridanus消息事件
+            
+        Returns:
+            消息是否重复
+        """
+        group_id = str(getattr(event, 'group_id', '')) if isinstance(event, GroupMessageEvent) else ''
+        if self.dedup.check_and_add((group_id, str(event.message_id))):
+            return True
+        if self.content_dedup is not None:
+            return self.content_dedup.check_and_add((group_id, str(event.user_id), self._content_digest(event)))
+        return False
+    
+    @staticmethod
+    def _content_digest(event: Union[GroupMessageEvent, PrivateMessageEvent]) -> str:
+        """
+        计算消息链内容摘要，只使用文本和文件路径，不读取媒体内容
+        
+        Args:
+            event: Eridanus消息事件
+            
+        Returns:
+            内容摘要
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for msg in event.message_chain:
+            if isinstance(msg, Text):
+                part = f'text:{msg.text}'
+            elif isinstance(msg, Image):
+                part = f'image:{getattr(msg, "file", "")}'
+            elif isinstance(msg, File):
+                part = f'file:{getattr(msg, "name", "")}|{getattr(msg, "file", "")}'
+            elif isinstance(msg, At):
+                part = f'at:{getattr(msg, "qq", "")}'
+            else:
+                part = type(msg).__name__
+            h.update(part.encode('utf-8', 'surrogatepass'))
+            h.update(b'\0')
+        return h.hexdigest()
+    
+    @staticmethod
+    def _write_base64(buf: bytearray, pos: int, chunk) -> int:
+        """
+        将一块数据base64编码后写入缓冲区
+        
+        Args:
+            buf: 目标缓冲区
+            pos: 写入位置
+            chunk: 原始数据块
+            
+        Returns:
+            写入后的位置
+        """
+        encoded = binascii.b2a_base64(chunk, newline=False)
+        end = pos + len(encoded)
+        buf[pos:end] = encoded
+        return end
+    
+    async def _file_to_base64(self, file_path: Path, prefix: str = '') -> Optional[Raw]:
         """
         将文件转换为base64编码
         
+        结果是可直接嵌入消息的JSON字符串 "<prefix><base64>"，base64数据分块写入
+        一个预先分配好大小的缓冲区，整个过程只产生这一份与文件大小相当的数据
+        
         Args:
             file_path: 文件路径
+            prefix: base64数据之前的前缀，例如'base64://'
             
         Returns:
-            base64编码的字符串
+            base64编码的JSON字符串，失败时返回None
         """
         try:
             # 检查输入参数
             if not file_path:
                 self.bot.logger.critical('[文件错误] 文件路径为空')
-                return ""
+                return None
                 
             file_path_str = str(file_path)
             if not file_path_str:
                 self.bot.logger.critical('[文件错误] 文件路径字符串为空')
-                return ""
+                return None
                 
             # 处理file://和file:前缀
             if file_path_str.startswith('file://'):
@@ -582,7 +1528,7 @@ class GsCoreAdapter:
             # 检查文件是否存在
             if not file_path.exists():
                 # 尝试在data/gs_core目录中查找文件
-                data_dir = Path(__file__).parent.parent.parent / "data" / "gs_core"
+                data_dir = self.data_dir
                 alternative_path = data_dir / file_path.name
                 self.bot.logger.debug(f'[调试] 尝试在 {data_dir} 中查找文件: {file_path.name}')
                 
@@ -591,25 +1537,29 @@ class GsCoreAdapter:
                     file_path = alternative_path
                 else:
                     self.bot.logger.debug(f'[文件错误] 文件不存在: {file_path} 且在 {data_dir} 中也未找到')
-                    return ""  # 或者返回一个默认的base64字符串
+                    return None
                 
             # 检查文件是否为空
             file_size = file_path.stat().st_size
             if file_size == 0:
                 self.bot.logger.warning(f'[文件警告] 文件为空: {file_path}')
-                return ""
+                return None
                 
+            # 按文件大小预先分配 "<prefix><base64>" 的缓冲区
+            head = msgjson.encode(prefix)[:-1]
+            buf = bytearray(len(head) + 4 * ((file_size + 2) // 3) + 1)
+            buf[:len(head)] = head
+            pos = len(head)
+            
             # 对于大文件，分块读取以避免内存问题
             if file_size > 10 * 1024 * 1024:  # 大于10MB的文件
                 self.bot.logger.debug(f'[调试] 大文件分块读取: {file_path}')
-                encoded_chunks = []
                 async with aiofiles.open(str(file_path), 'rb') as file:
                     while True:
-                        chunk = await file.read(8192)  # 8KB块
+                        chunk = await file.read(BASE64_CHUNK_SIZE)
                         if not chunk:
                             break
-                        encoded_chunks.append(b64encode(chunk).decode('utf-8'))
-                return ''.join(encoded_chunks)
+                        pos = self._write_base64(buf, pos, chunk)
             else:
                 # 读取文件并转换为base64
                 async with aiofiles.open(str(file_path), 'rb') as file:
@@ -618,22 +1568,31 @@ class GsCoreAdapter:
                 # 检查读取的内容是否为空
                 if not file_content:
                     self.bot.logger.warning(f'[文件警告] 文件内容为空: {file_path}')
-                    return ""
+                    return None
                     
-                base64_encoded = b64encode(file_content)
-                return base64_encoded.decode('utf-8')
+                view = memoryview(file_content)
+                for offset in range(0, len(view), BASE64_CHUNK_SIZE):
+                    pos = self._write_base64(buf, pos, view[offset:offset + BASE64_CHUNK_SIZE])
+            
+            # 写入结尾的引号，文件在读取期间发生变化时截断多余空间
+            if pos < len(buf):
+                buf[pos] = ord('"')
+                del buf[pos + 1:]
+            else:
+                buf.append(ord('"'))
+            return Raw(buf)
             
         except FileNotFoundError:
             self.bot.logger.error(f'[文件错误] 文件未找到: {file_path}')
-            return ""
+            return None
         except PermissionError:
             self.bot.logger.critical(f'[文件错误] 没有权限访问文件: {file_path}')
-            return ""
+            return None
         except Exception as e:
             self.bot.logger.critical(f'[文件错误] 处理文件时出错: {e}')
             import traceback
             self.bot.logger.error(traceback.format_exc())
-            return ""
+            return None
 
 def main(bot, config):
     """
@@ -646,6 +1605,19 @@ def main(bot, config):
     # 创建适配器实例，直接传递config对象
     adapter = GsCoreAdapter(bot, config)
     
+    # 插件加载时即在后台预热并连接，避免首条消息等待建立连接
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        adapter.start_task = loop.create_task(adapter.start())
+    else:
+        @bot.on(LifecycleMetaEvent)
+        async def handle_lifecycle(event: LifecycleMetaEvent):
+            if adapter.start_task is None and not adapter.is_connect:
+                adapter.start_task = asyncio.create_task(adapter.start())
+    
     # 注册事件监听器
     @bot.on(GroupMessageEvent)
     async def handle_group_message(event: GroupMessageEvent):